@@ -1,61 +1,308 @@
 # app.py
 import os
 import json
+import math
 import sqlite3
-from flask import Flask, render_template_string, request, redirect, url_for, jsonify, Response, session
+import queue
+import gzip
+import hashlib
+import threading
+import time
+from flask import Flask, request, redirect, url_for, Response, session, g
 from datetime import datetime, timedelta
 from contextlib import contextmanager
-import secrets
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
+from werkzeug.exceptions import ServiceUnavailable
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
+import orjson
+import brotli
+from flask_compress import Compress
 from dotenv import load_dotenv 
 
 load_dotenv() 
 
 app = Flask(__name__)
-print("Flask app object created.") # <-- DEBUG LOG
-app.secret_key = os.environ.get('SECRET_KEY')
+# Brotli for browsers that accept it, gzip otherwise; tiny bodies aren't worth the CPU.
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 500
+Compress(app)
+# Sessions must survive restarts and be shared by every worker, so the key comes from config,
+# never from a per-process random value. A known fallback key would let anyone forge a session,
+# so it is only allowed for local development (FLASK_DEBUG=1 or `python app.py`).
+if os.environ.get('SECRET_KEY'):
+    app.config['SECRET_KEY'] = os.environ['SECRET_KEY']
+elif app.debug or __name__ == '__main__':
+    app.config['SECRET_KEY'] = 'dev-insecure-secret-key'
+else:
+    raise RuntimeError("SECRET_KEY is not set; set it in the environment (or run with FLASK_DEBUG=1 for local development)")
 
 # ------ DB helpers ------
 
 DB_PATH = '/tmp/budget.db' if os.environ.get('VERCEL') else 'budget.db'
-print(f"DATABASE_PATH is set to: {DB_PATH}") # <-- DEBUG LOG
+
+# SQLite allows one writer at a time, so a bigger write pool only adds connections that wait on busy_timeout.
+WRITE_POOL_SIZE = 1
+READ_POOL_SIZE = os.cpu_count() or 4
+POOL_TIMEOUT_SECONDS = 10  # longer than busy_timeout, so a wait here means the pool is saturated
+_wal_enabled = set()  # journal_mode=WAL is persistent on the file, so set it once per DB_PATH
+
+# Per-connection settings, applied in one executescript when the pool opens a connection.
+CONNECTION_PRAGMAS = """
+PRAGMA synchronous=NORMAL;
+PRAGMA cache_size=-20000;
+PRAGMA temp_store=MEMORY;
+PRAGMA busy_timeout=5000;
+PRAGMA foreign_keys=ON;
+PRAGMA mmap_size=268435456;
+"""
+
+def connect_db(readonly=False):
+    app.logger.debug("db connect %s (readonly=%s)", DB_PATH, readonly)
+    # No detect_types: timestamps stay as the ISO strings SQLite stores, which is what the JSON API sends anyway.
+    # isolation_level=None: transactions are explicit (see write_transaction), never implicitly opened by sqlite3.
+    if readonly:
+        conn = sqlite3.connect(f'file:{DB_PATH}?mode=ro', uri=True, check_same_thread=False, isolation_level=None)
+    else:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    if not readonly and DB_PATH not in _wal_enabled:
+        conn.execute('PRAGMA journal_mode=WAL')
+        _wal_enabled.add(DB_PATH)
+    conn.executescript(CONNECTION_PRAGMAS)
+    return conn
+
+class ConnectionPool:
+    # Bounded pool of long-lived connections so SQLite's page cache survives across requests.
+    def __init__(self, factory, size, timeout=POOL_TIMEOUT_SECONDS):
+        self._factory = factory
+        self._timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._slots = threading.BoundedSemaphore(size)
+
+    def get(self):
+        # Bounded wait: a stuck writer or a burst of requests turns into a 503, not a hung thread.
+        if not self._slots.acquire(timeout=self._timeout):
+            raise ServiceUnavailable("Database is busy, please retry")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self._factory()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def put(self, conn):
+        try:
+            conn.rollback()  # never hand out a connection with a transaction left open
+            self._idle.put_nowait(conn)
+        except sqlite3.Error:
+            conn.close()
+        finally:
+            self._slots.release()
+
+# GET endpoints read through mode=ro connections, which never take SQLite's write locks.
+db_pool = ConnectionPool(connect_db, WRITE_POOL_SIZE)
+read_pool = ConnectionPool(lambda: connect_db(readonly=True), READ_POOL_SIZE)
+
+def checkout(pool):
+    conn = pool.get()
+    # Echo executed SQL to the app logger in debug mode only; production pays nothing.
+    conn.set_trace_callback(app.logger.debug if app.debug else None)
+    return conn
+
+def release_writer(conn):
+    try:
+        # Near no-op unless this connection's queries found stale planner statistics.
+        # Read-only connections can't write ANALYZE results, so only the writer runs it.
+        conn.execute('PRAGMA optimize')
+    except sqlite3.Error:
+        pass
+    finally:
+        db_pool.put(conn)
 
 def get_db():
-    print("Attempting to get DB connection...") # <-- DEBUG LOG
+    # Read-only connection, held for the rest of the request. Writes go through write_transaction().
+    if 'db_ro' not in g:
+        g.db_ro = checkout(read_pool)
+    return g.db_ro
+
+@contextmanager
+def write_transaction():
+    # The single writer is borrowed only for the transaction, so other requests wait on it
+    # for the length of a commit rather than a whole request.
+    conn = checkout(db_pool)
     try:
-        conn = sqlite3.connect(DB_PATH, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
-        conn.row_factory = sqlite3.Row
-        print("DB connection successful.") # <-- DEBUG LOG
-        return conn
-    except Exception as e:
-        print(f"!!! ERROR in get_db: {e}") # <-- DEBUG LOG
-        raise
+        # BEGIN IMMEDIATE takes the write lock up front: concurrent writers queue on busy_timeout
+        # instead of failing with SQLITE_BUSY when a deferred read transaction tries to upgrade.
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+    finally:
+        release_writer(conn)
+
+@app.errorhandler(ServiceUnavailable)
+def database_busy(e):
+    response = ojsonify({"error": e.description})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
+@app.teardown_appcontext
+def release_db(exc):
+    conn = g.pop('db_ro', None)
+    if conn is not None:
+        read_pool.put(conn)
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL, password_hash TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE IF NOT EXISTS income (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, amount_paise INTEGER NOT NULL, month_year VARCHAR(7) NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE, UNIQUE(user_id, month_year));
+CREATE TABLE IF NOT EXISTS budgets (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, category VARCHAR(100) NOT NULL, amount_paise INTEGER NOT NULL, month_year VARCHAR(7) NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE, UNIQUE(user_id, category, month_year));
+CREATE TABLE IF NOT EXISTS expenses (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, category VARCHAR(100) NOT NULL, amount_paise INTEGER NOT NULL, description TEXT, timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP, month_year TEXT GENERATED ALWAYS AS (substr(timestamp, 1, 7)) VIRTUAL, FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE);
+CREATE TABLE IF NOT EXISTS goals (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, name VARCHAR(100) NOT NULL, target_paise INTEGER NOT NULL, current_paise INTEGER NOT NULL DEFAULT 0, deadline DATE NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE, UNIQUE(user_id, name));
+CREATE TABLE IF NOT EXISTS notifications (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, message TEXT NOT NULL, type VARCHAR(50) NOT NULL, is_read BOOLEAN DEFAULT FALSE, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE);
+CREATE TABLE IF NOT EXISTS expense_monthly (user_id INTEGER NOT NULL, month_year TEXT NOT NULL, total_paise INTEGER NOT NULL, PRIMARY KEY (user_id, month_year)) WITHOUT ROWID;
+"""
+
+# Keeps expense_monthly in step with expenses inside the writing transaction, so trends read
+# a handful of pre-aggregated rows instead of summing every expense. A month whose total falls
+# to zero is dropped, matching the GROUP BY it replaces, which had no row for an emptied month. Runs after migrate_schema
+# because the triggers reference expenses.month_year and amount_paise.
+EXPENSE_MONTHLY_SQL = """
+DROP TRIGGER IF EXISTS trg_expense_monthly_insert;
+DROP TRIGGER IF EXISTS trg_expense_monthly_delete;
+DROP TRIGGER IF EXISTS trg_expense_monthly_update;
+CREATE TRIGGER trg_expense_monthly_insert AFTER INSERT ON expenses WHEN NEW.user_id IS NOT NULL BEGIN
+    INSERT INTO expense_monthly (user_id, month_year, total_paise) VALUES (NEW.user_id, NEW.month_year, NEW.amount_paise)
+    ON CONFLICT(user_id, month_year) DO UPDATE SET total_paise = total_paise + excluded.total_paise;
+END;
+CREATE TRIGGER trg_expense_monthly_delete AFTER DELETE ON expenses WHEN OLD.user_id IS NOT NULL BEGIN
+    UPDATE expense_monthly SET total_paise = total_paise - OLD.amount_paise WHERE user_id = OLD.user_id AND month_year = OLD.month_year;
+    DELETE FROM expense_monthly WHERE user_id = OLD.user_id AND month_year = OLD.month_year AND total_paise = 0;
+END;
+CREATE TRIGGER trg_expense_monthly_update AFTER UPDATE OF user_id, amount_paise, timestamp ON expenses BEGIN
+    UPDATE expense_monthly SET total_paise = total_paise - OLD.amount_paise WHERE user_id = OLD.user_id AND month_year = OLD.month_year;
+    DELETE FROM expense_monthly WHERE user_id = OLD.user_id AND month_year = OLD.month_year AND total_paise = 0;
+    INSERT INTO expense_monthly (user_id, month_year, total_paise) SELECT NEW.user_id, NEW.month_year, NEW.amount_paise WHERE NEW.user_id IS NOT NULL
+    ON CONFLICT(user_id, month_year) DO UPDATE SET total_paise = total_paise + excluded.total_paise;
+END;
+INSERT INTO expense_monthly (user_id, month_year, total_paise)
+SELECT user_id, month_year, SUM(amount_paise) FROM expenses
+WHERE user_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM expense_monthly)
+GROUP BY user_id, month_year;
+DELETE FROM expense_monthly WHERE total_paise = 0;
+"""
+
+INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_expenses_user_ts ON expenses(user_id, timestamp DESC);
+DROP INDEX IF EXISTS idx_expenses_user_cat_ts;
+CREATE INDEX IF NOT EXISTS idx_expenses_user_month ON expenses(user_id, month_year, category, amount_paise);
+CREATE INDEX IF NOT EXISTS idx_budgets_user_month ON budgets(user_id, month_year);
+CREATE INDEX IF NOT EXISTS idx_goals_user_created ON goals(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_notifications_user_unread ON notifications(user_id, is_read, created_at DESC);
+"""
+
+# Money columns that used to be DECIMAL rupees and are now stored as INTEGER paise.
+PAISE_COLUMNS = [
+    ('income', 'amount', 'amount_paise'),
+    ('budgets', 'amount', 'amount_paise'),
+    ('expenses', 'amount', 'amount_paise'),
+    ('goals', 'target_amount', 'target_paise'),
+    ('goals', 'current_amount', 'current_paise'),
+]
+
+def migrate_schema(conn):
+    # IMMEDIATE: the checks below must see the state the ALTERs apply to. A deferred read
+    # transaction can't upgrade once another worker has committed the same migration.
+    conn.execute('BEGIN IMMEDIATE')
+    for table, old, new in PAISE_COLUMNS:
+        columns = {c['name'] for c in conn.execute(f'PRAGMA table_info({table})')}
+        if old in columns:
+            conn.execute(f'ALTER TABLE {table} RENAME COLUMN {old} TO {new}')
+            conn.execute(f'UPDATE {table} SET {new} = CAST(ROUND({new} * 100) AS INTEGER)')
+    # table_xinfo (unlike table_info) lists generated columns.
+    if 'month_year' not in {c['name'] for c in conn.execute('PRAGMA table_xinfo(expenses)')}:
+        conn.execute('ALTER TABLE expenses ADD COLUMN month_year TEXT GENERATED ALWAYS AS (substr(timestamp, 1, 7)) VIRTUAL')
+    conn.commit()
+
+# Stored in PRAGMA user_version once a file has been brought up to date.
+# Bump it whenever SCHEMA_SQL, the migrations, the triggers or INDEX_SQL change.
+CURRENT_SCHEMA_VERSION = 2
 
 def init_db():
-    print("init_db function called.") # <-- DEBUG LOG
+    conn = connect_db()
     try:
-        db_exists = os.path.exists(DB_PATH)
-        print(f"Database exists check: {db_exists}") # <-- DEBUG LOG
-
-        with get_db() as conn:
-            if not db_exists:
-                print("Database does not exist. Creating new schema...") # <-- DEBUG LOG
-                conn.execute('PRAGMA foreign_keys = ON;')
-                print("Creating tables...") # <-- DEBUG LOG
-                conn.execute('''CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE NOT NULL, password_hash TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
-                conn.execute('''CREATE TABLE income (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, amount DECIMAL(10,2) NOT NULL, month_year VARCHAR(7) NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE, UNIQUE(user_id, month_year))''')
-                conn.execute('''CREATE TABLE budgets (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, category VARCHAR(100) NOT NULL, amount DECIMAL(10,2) NOT NULL, month_year VARCHAR(7) NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE, UNIQUE(user_id, category, month_year))''')
-                conn.execute('''CREATE TABLE expenses (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, category VARCHAR(100) NOT NULL, amount DECIMAL(10,2) NOT NULL, description TEXT, timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP, FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE)''')
-                conn.execute('''CREATE TABLE goals (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, name VARCHAR(100) NOT NULL, target_amount DECIMAL(10,2) NOT NULL, current_amount DECIMAL(10,2) DEFAULT 0, deadline DATE NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE, UNIQUE(user_id, name))''')
-                conn.execute('''CREATE TABLE notifications (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, message TEXT NOT NULL, type VARCHAR(50) NOT NULL, is_read BOOLEAN DEFAULT FALSE, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE)''')
-                print("All tables created.") # <-- DEBUG LOG
-                conn.commit()
-                print("Schema committed.") # <-- DEBUG LOG
-            else:
-                print("Database already exists. Skipping schema creation.") # <-- DEBUG LOG
-    except Exception as e:
-        print(f"!!! ERROR in init_db: {e}") # <-- DEBUG LOG
-        raise
+        # An up-to-date file skips all DDL, so booting workers don't queue on the write lock.
+        if conn.execute('PRAGMA user_version').fetchone()[0] < CURRENT_SCHEMA_VERSION:
+            # Idempotent DDL, and every step takes the write lock up front (BEGIN IMMEDIATE):
+            # racing workers queue on busy_timeout instead of failing a read-to-write upgrade.
+            conn.executescript("BEGIN IMMEDIATE; " + SCHEMA_SQL + " COMMIT;")
+            migrate_schema(conn)
+            # Serialized like the rest, so only the first worker backfills.
+            conn.executescript("BEGIN IMMEDIATE; " + EXPENSE_MONTHLY_SQL + " COMMIT;")
+            indexes_sql = "SELECT group_concat(name) FROM sqlite_master WHERE type = 'index'"
+            indexes_before = conn.execute(indexes_sql).fetchone()[0]
+            conn.executescript("BEGIN IMMEDIATE; " + INDEX_SQL + " COMMIT;")
+            if conn.execute(indexes_sql).fetchone()[0] != indexes_before:
+                conn.execute('ANALYZE')  # give the planner statistics for indexes it has never seen
+            conn.execute(f'PRAGMA user_version = {CURRENT_SCHEMA_VERSION}')
+        # The demo account is seeded from a precomputed hash, so starting up never runs the KDF.
+        if conn.execute("SELECT 1 FROM users WHERE username = 'demo'").fetchone() is None:
+            conn.execute('INSERT OR IGNORE INTO users (username, password_hash) VALUES (?, ?)', ('demo', DEMO_PASSWORD_HASH))
+        conn.execute('PRAGMA optimize=0x10002')
+    finally:
+        conn.close()
+
+def month_year(d):
+    # f-string formatting skips strftime's locale-aware formatter on every write.
+    return f"{d.year:04d}-{d.month:02d}"
+
+def current_month_year():
+    return month_year(datetime.now())
+
+MAX_AMOUNT = 10 ** 12  # rupees; keeps paise (and their SUMs) far inside SQLite's 64-bit integers
+
+def to_paise(amount):
+    # The JSON API speaks rupees; convert at the boundary. Returns None for invalid input,
+    # including NaN/Infinity (which JSON parsing accepts) and values too large to store.
+    if isinstance(amount, bool) or not isinstance(amount, (int, float)):
+        return None
+    if not math.isfinite(amount) or not 0 <= amount <= MAX_AMOUNT:
+        return None
+    return int(round(amount * 100))
+
+# ------ Password helpers ------
+
+# Pinned rather than inherited from argon2-cffi's defaults (RFC 9106's low-memory profile:
+# 3 passes over 64 MiB), so a library upgrade can't silently change login latency. About 100 ms
+# per hash; raising either cost rehashes existing accounts on their next login.
+password_hasher = PasswordHasher(time_cost=3, memory_cost=64 * 1024, parallelism=4)
+
+# hash_password('demo') computed once with the parameters above. init_db runs on the first
+# request under a lock, so hashing there would stall every request that arrives meanwhile.
+# If the parameters change this is simply rehashed on the demo user's next login.
+DEMO_PASSWORD_HASH = '$argon2id$v=19$m=65536,t=3,p=4$g4OIjuzq4TRcfg1urzAT6A$UwbOBxrQc6QIKhRIkizN/4XZ6654cq4rDTxVdVDAkqY'
+
+def hash_password(password):
+    return password_hasher.hash(password)
+
+def verify_password(password_hash, password):
+    # Accounts created before the switch to argon2 still carry Werkzeug hashes.
+    if not password_hash.startswith('$argon2'):
+        return check_password_hash(password_hash, password)
+    try:
+        return password_hasher.verify(password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+def password_needs_rehash(password_hash):
+    return not password_hash.startswith('$argon2') or password_hasher.check_needs_rehash(password_hash)
 
 # ------ HTML Templates ------
 
@@ -65,6 +312,8 @@ REGISTER_HTML = """
 <head>
   <meta charset="utf-8">
   <title>Register - Budget Planner</title>
+  <link rel="preconnect" href="https://fonts.googleapis.com">
+  <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
   <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;700&display=swap" rel="stylesheet">
   <style>
     body { font-family: 'Inter', sans-serif; display:flex; min-height:100vh; align-items:center; justify-content:center; background:#f3f5f6; margin:0; }
@@ -102,6 +351,8 @@ LOGIN_HTML = """
 <head>
   <meta charset="utf-8">
   <title>Login - Budget Planner</title>
+  <link rel="preconnect" href="https://fonts.googleapis.com">
+  <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
   <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;700&display=swap" rel="stylesheet">
   <style>
     body { font-family: 'Inter', sans-serif; display:flex; min-height:100vh; align-items:center; justify-content:center; background:#f3f5f6; margin:0; }
@@ -141,81 +392,14 @@ MAIN_HTML = """
   <meta charset="UTF-8">
   <meta name="viewport" content="width=device-width, initial-scale=1.0">
   <title>Advanced Budget & Goal Planner</title>
+  <link rel="preconnect" href="https://fonts.googleapis.com">
+  <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+  <link rel="preconnect" href="https://cdn.jsdelivr.net" crossorigin>
   <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap" rel="stylesheet">
-  <style>
-    :root {
-      --primary-color: #556ee6; --primary-hover: #485ec4;
-      --success-color: #34c38f; --warning-color: #f1b44c; --danger-color: #f46a6a; --danger-hover: #d9534f;
-      --bg-light: #f8f8fb; --card-bg-light: #ffffff; --text-color-light: #495057;
-      --border-color-light: #e6e9ec; --muted-text-light: #74788d;
-      --bg-dark: #1a2035; --card-bg-dark: #2a3042; --text-color-dark: #e9ecef;
-      --border-color-dark: #363b4f; --muted-text-dark: #a6b0cf;
-    }
-    [data-theme="light"] {
-      --bg-color: var(--bg-light); --card-bg: var(--card-bg-light); --text-color: var(--text-color-light);
-      --border-color: var(--border-color-light); --muted-text: var(--muted-text-light);
-    }
-    [data-theme="dark"] {
-      --bg-color: var(--bg-dark); --card-bg: var(--card-bg-dark); --text-color: var(--text-color-dark);
-      --border-color: var(--border-color-dark); --muted-text: var(--muted-text-dark);
-    }
-    *, *::before, *::after { box-sizing: border-box; }
-    body { margin:0; font-family: 'Inter', sans-serif; background:var(--bg-color); color:var(--text-color); transition: background 0.2s, color 0.2s; }
-    .sidebar { width:240px; position:fixed; top:0; left:0; bottom:0; background:var(--card-bg); padding:20px; box-shadow:2px 0 8px rgba(0,0,0,0.05); z-index:100; display:flex; flex-direction:column; border-right: 1px solid var(--border-color); }
-    .sidebar-header { font-weight:700; font-size:20px; margin-bottom:24px; color: var(--primary-color); }
-    .sidebar-nav { list-style:none; padding:0; margin:0; }
-    .sidebar-nav a { display:block; padding:12px 16px; margin:4px 0; border-radius:8px; text-decoration:none; color:var(--muted-text); font-weight:500; transition: background 0.2s, color 0.2s; }
-    .sidebar-nav a:hover, .sidebar-nav a.active { background: rgba(85, 110, 230, 0.1); color: var(--primary-color); }
-    .main-content { margin-left:240px; padding:24px; }
-    .top-bar { display:flex; justify-content:flex-end; gap:16px; align-items:center; margin-bottom:24px; }
-    .card { background:var(--card-bg); padding:24px; border-radius:12px; box-shadow:0 0 20px rgba(0,0,0,0.05); margin-bottom:24px; border: 1px solid var(--border-color); }
-    h2, h3 { color: var(--text-color); font-weight: 600; margin-top:0; }
-    .grid-container { display:grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap:20px; }
-    .stat-card { padding:20px; border-radius:8px; background:var(--card-bg); text-align:center; border: 1px solid var(--border-color); }
-    .stat-card h3 { margin: 0 0 8px 0; font-size: 2rem; font-weight: 700; color: var(--primary-color); }
-    .stat-card p { margin: 0; color: var(--muted-text); font-weight: 500; }
-    .notification-bell { position:relative; cursor:pointer; }
-    .notification-count { position:absolute; top:-6px; right:-8px; background:var(--danger-color); color:white; border-radius:50%; width:20px; height:20px; font-size:12px; display:flex; align-items:center; justify-content:center; }
-    .notification-panel { position:absolute; top:40px; right:0; background:var(--card-bg); border:1px solid var(--border-color); border-radius:8px; width:320px; max-height:400px; overflow-y:auto; box-shadow:0 4px 12px rgba(0,0,0,0.1); z-index:1000; display:none; }
-    .notification-item { padding:12px 16px; border-bottom:1px solid var(--border-color); } .notification-item:last-child { border-bottom:none; }
-    .notification-item.unread { background:rgba(85, 110, 230, 0.05); }
-    .progress-bar { width:100%; height:12px; background:var(--border-color); border-radius:6px; margin:10px 0; overflow:hidden; }
-    .progress-fill { height:100%; transition:width 0.3s ease; background-color: var(--primary-color); }
-    form { display:flex; flex-direction:column; gap:12px; margin-top:12px; max-width:500px; }
-    input, select { padding:10px 12px; border-radius:6px; border:1px solid var(--border-color); background: var(--bg-color); color: var(--text-color); font-size:1rem; }
-    button { padding:10px 16px; border-radius:6px; border:none; background:var(--primary-color); color:white; cursor:pointer; font-weight:500; transition: background 0.2s; }
-    button:hover { background:var(--primary-hover); }
-    .btn-delete { background-color: var(--danger-color); } .btn-delete:hover { background-color: var(--danger-hover); }
-    .two-col { display:grid; grid-template-columns:1fr 1fr; gap:12px; }
-    .list-item { display:flex; justify-content:space-between; align-items:center; padding:10px 4px; border-bottom:1px solid var(--border-color);}
-    #toast-container { position: fixed; bottom: 20px; right: 20px; z-index: 9999; display: flex; flex-direction: column; gap: 10px; }
-    .toast { padding: 12px 20px; color: white; border-radius: 8px; box-shadow: 0 4px 12px rgba(0,0,0,0.15); opacity: 0; transform: translateY(20px); transition: opacity 0.3s, transform 0.3s; font-weight: 500; }
-    .toast.show { opacity: 1; transform: translateY(0); }
-    .toast-success { background-color: var(--success-color); }
-    .toast-error { background-color: var(--danger-color); }
-
-    /* --- NEW: Mobile Styles --- */
-    @media (max-width: 900px) {
-      .sidebar {
-        display: none;
-      }
-      .main-content {
-        margin-left: 0;
-        padding: 16px;
-      }
-      /* This makes form inputs stack vertically */
-      .two-col {
-        grid-template-columns: 1fr;
-      }
-      .card {
-        padding: 16px;
-      }
-      h2 {
-        font-size: 1.5rem;
-      }
-    }
-</style>
-  <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+  <link rel="stylesheet" href="{{ url_for('static', filename='style.css', v=STATIC_VERSIONS['style.css']) }}">
+  <!-- Pinned version: jsDelivr serves exact-version files with a one-year immutable cache. -->
+  <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.js" crossorigin="anonymous" defer></script>
+  <script src="{{ url_for('static', filename='app.js', v=STATIC_VERSIONS['app.js']) }}" defer></script>
 </head>
 <body data-theme="light">
   <nav class="sidebar">
@@ -331,289 +515,90 @@ MAIN_HTML = """
 
   </main>
 
-  <script>
-    let state = { income: {}, budgets: {}, expenses: [], goals: {}, notifications: [] };
-    let expenseChart, trendChart;
-    
-    // UPDATE: Fixed timestamp to always use Indian Standard Time
-    function formatTimestamp(isoString) {
-        if (!isoString) return '';
-        const options = {
-            year: 'numeric', month: 'short', day: 'numeric',
-            hour: 'numeric', minute: '2-digit', hour12: true,
-            timeZone: 'Asia/Kolkata'
-        };
-        return new Date(isoString).toLocaleString('en-IN', options);
-    }
-
-    // --- API Helpers ---
-    async function apiCall(url, method = 'GET', data = null) {
-        const options = { method, headers: { 'Content-Type': 'application/json' } };
-        if (data) options.body = JSON.stringify(data);
-        const res = await fetch(url, options);
-        if (!res.ok) {
-            const error = await res.json();
-            throw new Error(error.error || 'An unknown error occurred');
-        }
-        return res.json();
-    }
-
-    // --- State Management ---
-    async function loadState() {
-      try {
-        state = await apiCall("/api/data");
-        refreshUI();
-      } catch (err) {
-        showToast(err.message, 'error');
-        if (err.message.includes("Not authorized")) window.location.href = "/login";
-      }
-    }
-
-    // --- Actions ---
-    async function setIncome(amount) {
-      try { await apiCall("/api/income", "POST", { amount }); await loadState(); showToast('Income updated!', 'success');
-      } catch (e) { showToast(e.message, 'error'); }
-    }
-    async function addBudget(category, amount) {
-      try { await apiCall("/api/budget", "POST", { category, amount }); await loadState(); showToast('Budget updated!', 'success');
-      } catch (e) { showToast(e.message, 'error'); }
-    }
-    async function addExpense(category, amount, description = "") {
-      try { await apiCall("/api/expense", "POST", { category, amount, description }); await loadState(); showToast('Expense recorded!', 'success');
-      } catch (e) { showToast(e.message, 'error'); }
-    }
-    async function addGoal(name, target, deadline) {
-      try { await apiCall("/api/goal", "POST", { name, target, deadline }); await loadState(); showToast('New goal set!', 'success');
-      } catch (e) { showToast(e.message, 'error'); }
-    }
-    async function addSaving(goal_name, amount) {
-      if (!goal_name) { showToast('Please select a goal first.', 'error'); return; }
-      try { await apiCall("/api/saving", "POST", { goal_name, amount }); await loadState(); showToast(`₹${amount.toFixed(2)} added to "${goal_name}"`, 'success');
-      } catch (e) { showToast(e.message, 'error'); }
-    }
-    // NEW: Delete actions
-    async function deleteBudget(category) {
-      if (!confirm(`Are you sure you want to delete the "${category}" budget?`)) return;
-      try { await apiCall("/api/budget/delete", "POST", { category }); await loadState(); showToast('Budget deleted.', 'success');
-      } catch (e) { showToast(e.message, 'error'); }
-    }
-    async function deleteGoal(name) {
-      if (!confirm(`Are you sure you want to delete the "${name}" goal?`)) return;
-      try { await apiCall("/api/goal/delete", "POST", { name }); await loadState(); showToast('Goal deleted.', 'success');
-      } catch (e) { showToast(e.message, 'error'); }
-    }
-    // NEW: Quick Save action
-    function addRemainingBalanceToGoal() {
-        const goalName = document.getElementById('quick-save-goal-selector').value;
-        if (!goalName) { showToast('Please select a goal from the dropdown.', 'error'); return; }
-        
-        const currentMonthExpenses = state.expenses.filter(e => e.timestamp && e.timestamp.startsWith(new Date().toISOString().slice(0, 7)));
-        const totalExpenses = currentMonthExpenses.reduce((sum, e) => sum + e.amount, 0);
-        const income = state.income.amount || 0;
-        const remaining = income - totalExpenses;
-
-        if (remaining <= 0) {
-            showToast('No remaining balance to save.', 'warning');
-            return;
-        }
-        addSaving(goalName, remaining);
-    }
-
-    // --- UI Rendering ---
-    function refreshUI() {
-        const currentMonthExpenses = state.expenses.filter(e => e.timestamp && e.timestamp.startsWith(new Date().toISOString().slice(0, 7)));
-        updateDashboardStats(currentMonthExpenses);
-        refreshExpenseList(state.expenses);
-        refreshBudgetList();
-        refreshGoalList();
-        refreshSelectors();
-        updateCharts(currentMonthExpenses);
-        displayBudgetAlerts(currentMonthExpenses);
-        updateNotificationCount();
-    }
-
-    function updateDashboardStats(expenses) {
-      const totalExpenses = expenses.reduce((sum, e) => sum + e.amount, 0);
-      const income = state.income.amount || 0;
-      const remaining = income - totalExpenses;
-      const savingsRate = income > 0 ? ((remaining / income) * 100).toFixed(1) : 0;
-      document.getElementById('dashboard-income').textContent = `₹${income.toFixed(2)}`;
-      document.getElementById('dashboard-expenses').textContent = `₹${totalExpenses.toFixed(2)}`;
-      document.getElementById('dashboard-remaining').textContent = `₹${remaining.toFixed(2)}`;
-      document.getElementById('dashboard-savings-rate').textContent = `${savingsRate > 0 ? savingsRate : 0}%`;
-      const incomeUpdatedElem = document.getElementById('income-last-updated');
-      if (state.income && state.income.updated_at) {
-          incomeUpdatedElem.textContent = `Last updated: ${formatTimestamp(state.income.updated_at)}`;
-      } else {
-          incomeUpdatedElem.textContent = 'No income set for this month yet.';
-      }
-    }
-    
-    function refreshExpenseList(allExpenses) {
-      const list = document.getElementById('expenseList');
-      if (!allExpenses || allExpenses.length === 0) { list.innerHTML = "<p>No expenses recorded yet.</p>"; return; }
-      list.innerHTML = allExpenses.slice(0, 10).map(e => `
-        <div class="list-item">
-            <div>
-                <strong style="display:block;">${e.category}</strong>
-                <span style="font-size:0.9em; color:var(--muted-text);">${e.description || formatTimestamp(e.timestamp)}</span>
-            </div>
-            <span style="font-weight:600; font-size:1.1em;">₹${e.amount.toFixed(2)}</span>
-        </div>`).join('');
-    }
-
-    // NEW: Function to render the budget list with delete buttons
-    function refreshBudgetList() {
-        const container = document.getElementById('budgetList');
-        const budgets = state.budgets || {};
-        const keys = Object.keys(budgets);
-        if (keys.length === 0) { container.innerHTML = "<p>No budgets set for this month.</p>"; return; }
-        container.innerHTML = keys.map(k => {
-            const b = budgets[k];
-            return `<div class="list-item">
-                        <span><strong>${k}</strong>: ₹${b.amount.toFixed(2)}</span>
-                        <button class="btn-delete" onclick="deleteBudget('${k}')">Delete</button>
-                    </div>`;
-        }).join('');
-    }
-
-    function refreshGoalList() {
-        const container = document.getElementById('goalList');
-        const goals = state.goals || {};
-        const keys = Object.keys(goals);
-        if (keys.length === 0) { container.innerHTML = "<p>No goals set yet.</p>"; return; }
-        container.innerHTML = keys.map(k => {
-            const g = goals[k];
-            const pct = g.target > 0 ? Math.min(100, (g.current / g.target) * 100) : 0;
-            return `<div style="margin-bottom:16px; padding-bottom:12px; border-bottom: 1px solid var(--border-color);">
-                        <div style="display:flex; justify-content:space-between; align-items:center;">
-                            <strong>${k}</strong>
-                            <button class="btn-delete" onclick="deleteGoal('${k}')">Delete</button>
-                        </div>
-                        <div style="color:var(--muted-text); font-size:0.9em;">Deadline: ${g.deadline || 'N/A'}</div>
-                        <div style="display:flex; justify-content:space-between; color:var(--muted-text); font-size:0.9em;">
-                            <span>₹${g.current.toFixed(2)}</span>
-                            <span>₹${g.target.toFixed(2)}</span>
-                        </div>
-                        <div class="progress-bar"><div class="progress-fill" style="width:${pct}%;"></div></div>
-                    </div>`;
-        }).join('');
-    }
-
-    function refreshSelectors() {
-        const budgetDatalist = document.getElementById('budget-categories');
-        const budgetCategories = Object.keys(state.budgets || {});
-        budgetDatalist.innerHTML = budgetCategories.map(cat => `<option value="${cat}">`).join('');
-        
-        const goalSelector = document.getElementById('goal-selector');
-        const quickSaveSelector = document.getElementById('quick-save-goal-selector');
-        const goalNames = Object.keys(state.goals || {});
-        const goalOptions = '<option value="">Select a Goal</option>' + goalNames.map(name => `<option value="${name}">${name}</option>`).join('');
-        goalSelector.innerHTML = goalOptions;
-        quickSaveSelector.innerHTML = goalOptions;
-    }
-    
-    function displayBudgetAlerts(expenses) {
-        const container = document.getElementById('budgetAlerts');
-        let html = '<h3>Budget Status</h3>';
-        const budgetKeys = Object.keys(state.budgets);
-        if(budgetKeys.length === 0) { container.innerHTML = '<h3>Budget Status</h3><p>No budgets set for this month.</p>'; return; }
-        budgetKeys.forEach(category => {
-            const budgetAmount = state.budgets[category].amount;
-            const spent = expenses.filter(e => e.category === category).reduce((sum, e) => sum + e.amount, 0);
-            const pct = budgetAmount > 0 ? Math.min(100, (spent / budgetAmount) * 100) : 0;
-            const statusColor = pct >= 100 ? 'var(--danger-color)' : pct > 80 ? 'var(--warning-color)' : 'var(--success-color)';
-            html += `<div style="margin-bottom:12px;">
-                        <strong>${category}</strong>
-                        <div style="display:flex; justify-content:space-between; color:var(--muted-text); font-size:0.9em;">
-                           <span>Spent: ₹${spent.toFixed(2)}</span>
-                           <span>Budget: ₹${budgetAmount.toFixed(2)}</span>
-                        </div>
-                        <div class="progress-bar"><div class="progress-fill" style="width:${pct}%; background-color:${statusColor};"></div></div>
-                     </div>`;
-        });
-        container.innerHTML = html;
-    }
-    
-    function toggleNotifications() {
-        const panel = document.getElementById('notificationPanel');
-        const isVisible = panel.style.display === 'block';
-        panel.style.display = isVisible ? 'none' : 'block';
-        if (!isVisible) loadNotifications();
-    }
-    async function loadNotifications() {
-        state.notifications = await apiCall("/api/notifications");
-        updateNotificationCount();
-        renderNotificationPanel();
-    }
-    function updateNotificationCount() {
-        const count = state.notifications.filter(n => !n.is_read).length;
-        document.getElementById('notificationCount').textContent = count;
-        document.getElementById('notificationCount').style.display = count > 0 ? 'flex' : 'none';
-    }
-    function renderNotificationPanel() {
-        const panel = document.getElementById('notificationPanel');
-        if (!state.notifications.length) { panel.innerHTML = "<div style='padding:12px;'>No new notifications</div>"; return; }
-        panel.innerHTML = state.notifications.map(n => `
-            <div class="notification-item ${n.is_read ? '' : 'unread'}">
-                <div style="font-size:14px;">${n.message}</div>
-                <div style="font-size:11px; color:var(--muted-text); margin-top:6px;">${formatTimestamp(n.created_at)}</div>
-            </div>`).join('');
-    }
-    function showToast(message, type = 'success') {
-        const container = document.getElementById('toast-container');
-        const toast = document.createElement('div');
-        toast.className = `toast toast-${type}`;
-        toast.textContent = message;
-        container.appendChild(toast);
-        setTimeout(() => { toast.classList.add('show'); }, 10);
-        setTimeout(() => { toast.classList.remove('show'); setTimeout(() => toast.remove(), 300); }, 3000);
-    }
-    async function updateCharts(currentMonthExpenses) {
-        const pieCtx = document.getElementById("expenseChart")?.getContext("2d");
-        if (pieCtx) {
-            const categoryTotals = {};
-            currentMonthExpenses.forEach(e => { categoryTotals[e.category] = (categoryTotals[e.category] || 0) + e.amount; });
-            if (expenseChart) expenseChart.destroy();
-            expenseChart = new Chart(pieCtx, { type: "pie", data: { labels: Object.keys(categoryTotals), datasets: [{ data: Object.values(categoryTotals) }] } });
-        }
-        const trendCtx = document.getElementById("trendChart")?.getContext("2d");
-        if (trendCtx) {
-            const trends = await apiCall("/api/analytics/trends");
-            if (trendChart) trendChart.destroy();
-            trendChart = new Chart(trendCtx, {
-                type: 'line',
-                data: { labels: trends.labels, datasets: [{ label: 'Expenses', data: trends.expenses, tension: 0.2, borderColor: 'var(--primary-color)', pointBackgroundColor: 'var(--primary-color)' }] },
-                options: { responsive:true, scales:{ y:{ beginAtZero:true } } }
-            });
-        }
-    }
-    function toggleTheme() {
-        const currentTheme = document.body.getAttribute('data-theme');
-        const newTheme = currentTheme === 'light' ? 'dark' : 'light';
-        document.body.setAttribute('data-theme', newTheme);
-        localStorage.setItem('theme', newTheme);
-    }
-    window.onload = async function () {
-        const savedTheme = localStorage.getItem('theme') || 'light';
-        document.body.setAttribute('data-theme', savedTheme);
-        await loadState();
-        await loadNotifications();
-    };
-    function logout() { window.location.href = "/logout"; }
-    </script>
 </body>
 </html>
 """
 
-
-init_db()
+# Compile the templates once at import instead of re-parsing them on every request.
+REGISTER_TEMPLATE = app.jinja_env.from_string(REGISTER_HTML)
+LOGIN_TEMPLATE = app.jinja_env.from_string(LOGIN_HTML)
+MAIN_TEMPLATE = app.jinja_env.from_string(MAIN_HTML)
+
+def render(template, **context):
+    app.update_template_context(context)
+    return template.render(context)
+
+def static_version(filename):
+    with open(os.path.join(app.static_folder, filename), 'rb') as f:
+        return hashlib.md5(f.read()).hexdigest()[:12]
+
+# Content hashes for ?v= cache busting, so static files can be cached as immutable.
+STATIC_VERSIONS = {name: static_version(name) for name in ('style.css', 'app.js')}
+app.jinja_env.globals['STATIC_VERSIONS'] = STATIC_VERSIONS
+
+# MAIN_HTML renders without per-user context, so its body is built and compressed once per
+# encoding and revalidated by ETag. Responses that already carry Content-Encoding pass through
+# Flask-Compress untouched, so it never recompresses this page.
+MAIN_ETAG = hashlib.md5((MAIN_HTML + ''.join(STATIC_VERSIONS.values())).encode()).hexdigest()
+_main_page_cache = {}
+
+def main_page(encoding):
+    if encoding not in _main_page_cache:
+        body = render(MAIN_TEMPLATE).encode()
+        if encoding == 'br':
+            body = brotli.compress(body, quality=11)  # paid once, so the slowest, smallest setting
+        elif encoding == 'gzip':
+            body = gzip.compress(body, 9)
+        _main_page_cache[encoding] = body
+    return _main_page_cache[encoding]
+
+def main_page_encoding():
+    for encoding in app.config['COMPRESS_ALGORITHM']:
+        if request.accept_encodings.quality(encoding) > 0:
+            return encoding
+    return None
+
+# Schema setup runs on the first request rather than at import, keeping it off the cold-start path.
+_db_initialized = False
+_db_init_lock = threading.Lock()
+
+@app.before_request
+def ensure_db():
+    global _db_initialized
+    if not _db_initialized:
+        with _db_init_lock:
+            if not _db_initialized:
+                init_db()
+                _db_initialized = True
 
 @app.route('/')
 def home():
     if not session.get('logged_in'):
         return redirect(url_for('login'))
-    return render_template_string(MAIN_HTML)
+    # ETags follow Flask-Compress's "<hash>:<encoding>" form; any variant of the current hash
+    # is fresh, so answer those before touching the page cache.
+    current = [etag for etag in request.if_none_match if etag.split(':')[0] == MAIN_ETAG]
+    if current:
+        response = Response(status=304)
+        response.set_etag(current[0])
+    else:
+        encoding = main_page_encoding()
+        response = Response(main_page(encoding), mimetype='text/html')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.set_etag(f'{MAIN_ETAG}:{encoding}' if encoding else MAIN_ETAG)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@app.after_request
+def cache_static(response):
+    # Versioned static URLs change whenever the file does, so browsers may keep them forever.
+    if request.endpoint == 'static' and 'v' in request.args and response.status_code == 200:
+        response.cache_control.public = True
+        response.cache_control.max_age = 31536000
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+    return response
 
 # (Keep all your other @app.route functions here)
 @app.route('/login', methods=['GET', 'POST'])
@@ -621,23 +606,19 @@ def login():
     if request.method == 'POST':
         username = request.form.get('username')
         password = request.form.get('password')
-        with get_db() as conn:
-            user = conn.execute('SELECT * FROM users WHERE username = ?', (username,)).fetchone()
-            if not user and username == "demo" and password == "demo":
-                try:
-                    password_hash = generate_password_hash("demo")
-                    conn.execute('INSERT INTO users (username, password_hash) VALUES (?, ?)', (username, password_hash))
-                    conn.commit()
-                    user = conn.execute('SELECT * FROM users WHERE username = ?', (username,)).fetchone()
-                except sqlite3.IntegrityError:
-                    user = conn.execute('SELECT * FROM users WHERE username = ?', (username,)).fetchone()
-            if user and check_password_hash(user['password_hash'], password):
-                session['logged_in'] = True
-                session['user_id'] = user['id']
-                return redirect(url_for('home'))
-            else:
-                return render_template_string(LOGIN_HTML, login_message="❌ Invalid credentials")
-    return render_template_string(LOGIN_HTML)
+        user_id, stored_hash = tuple_cursor(get_db()).execute(USER_LOGIN_SQL, (username,)).fetchone() or (None, None)
+        if user_id is not None and verify_password(stored_hash, password):
+            if password_needs_rehash(stored_hash):
+                # Hash before taking the write lock so it is never held for a KDF run.
+                password_hash = hash_password(password)
+                with write_transaction() as conn:
+                    conn.execute(REHASH_PASSWORD_SQL, (password_hash, user_id))
+            session['logged_in'] = True
+            session['user_id'] = user_id
+            return redirect(url_for('home'))
+        else:
+            return render(LOGIN_TEMPLATE, login_message="❌ Invalid credentials")
+    return render(LOGIN_TEMPLATE)
 
 @app.route('/register', methods=['GET', 'POST'])
 def register():
@@ -646,186 +627,341 @@ def register():
         password = request.form.get('password')
         confirm_password = request.form.get('confirm_password')
         if not all([username, password, confirm_password]):
-            return render_template_string(REGISTER_HTML, login_message="❌ Please fill out all fields.")
+            return render(REGISTER_TEMPLATE, login_message="❌ Please fill out all fields.")
         if password != confirm_password:
-            return render_template_string(REGISTER_HTML, login_message="❌ Passwords don't match")
+            return render(REGISTER_TEMPLATE, login_message="❌ Passwords don't match")
         if len(password) < 6:
-            return render_template_string(REGISTER_HTML, login_message="❌ Password must be at least 6 characters")
+            return render(REGISTER_TEMPLATE, login_message="❌ Password must be at least 6 characters")
+        password_hash = hash_password(password)
         try:
-            with get_db() as conn:
-                password_hash = generate_password_hash(password)
+            with write_transaction() as conn:
                 conn.execute('INSERT INTO users (username, password_hash) VALUES (?, ?)', (username, password_hash))
-                conn.commit()
-                return redirect(url_for('login'))
+            return redirect(url_for('login'))
         except sqlite3.IntegrityError:
-            return render_template_string(REGISTER_HTML, login_message="❌ Username already exists")
-    return render_template_string(REGISTER_HTML)
+            return render(REGISTER_TEMPLATE, login_message="❌ Username already exists")
+    return render(REGISTER_TEMPLATE)
 
 @app.route('/logout')
 def logout():
     session.clear()
     return redirect(url_for('login'))
 
+def ojsonify(obj):
+    # orjson serializes straight to bytes and is several times faster than the stdlib encoder behind jsonify.
+    return Response(orjson.dumps(obj), mimetype='application/json')
+
 def check_session():
     if not session.get('logged_in'):
-        return jsonify({"error": "Not authorized"}), 401
+        return ojsonify({"error": "Not authorized"}), 401
     return None, None
 
 @app.route('/api/data')
 def get_data():
     error_response, status_code = check_session()
     if error_response: return error_response, status_code
-    return jsonify(load_user_data(session.get('user_id')))
+    return Response(load_user_data(session.get('user_id')), mimetype='application/json')
 
 @app.route('/api/income', methods=['POST'])
 def set_income():
     error_response, status_code = check_session()
     if error_response: return error_response, status_code
-    amount = request.json.get('amount')
-    if not isinstance(amount, (int, float)) or amount < 0:
-        return jsonify({"error": "Invalid amount"}), 400
-    current_month = datetime.now().strftime('%Y-%m')
-    with get_db() as conn:
+    amount_paise = to_paise(request.json.get('amount'))
+    if amount_paise is None:
+        return ojsonify({"error": "Invalid amount"}), 400
+    current_month = current_month_year()
+    with write_transaction() as conn:
         conn.execute('''
-            INSERT INTO income (user_id, amount, month_year, created_at) VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-            ON CONFLICT(user_id, month_year) DO UPDATE SET amount = excluded.amount, created_at = CURRENT_TIMESTAMP
-        ''', (session.get('user_id'), amount, current_month))
-        conn.commit()
-    return jsonify({"success": True})
+            INSERT INTO income (user_id, amount_paise, month_year, created_at) VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(user_id, month_year) DO UPDATE SET amount_paise = excluded.amount_paise, created_at = CURRENT_TIMESTAMP
+        ''', (session.get('user_id'), amount_paise, current_month))
+    return ojsonify({"success": True})
 
 @app.route('/api/budget', methods=['POST'])
 def add_budget():
     error_response, status_code = check_session()
     if error_response: return error_response, status_code
     category = request.json.get('category')
-    amount = request.json.get('amount')
-    current_month = datetime.now().strftime('%Y-%m')
-    with get_db() as conn:
+    amount_paise = to_paise(request.json.get('amount'))
+    if amount_paise is None:
+        return ojsonify({"error": "Invalid amount"}), 400
+    current_month = current_month_year()
+    with write_transaction() as conn:
         conn.execute('''
-            INSERT INTO budgets (user_id, category, amount, month_year) VALUES (?, ?, ?, ?)
-            ON CONFLICT(user_id, category, month_year) DO UPDATE SET amount = excluded.amount
-        ''', (session.get('user_id'), category, amount, current_month))
-        conn.commit()
-    return jsonify({"success": True})
+            INSERT INTO budgets (user_id, category, amount_paise, month_year) VALUES (?, ?, ?, ?)
+            ON CONFLICT(user_id, category, month_year) DO UPDATE SET amount_paise = excluded.amount_paise
+        ''', (session.get('user_id'), category, amount_paise, current_month))
+    return ojsonify({"success": True})
 
 @app.route('/api/budget/delete', methods=['POST'])
 def delete_budget():
     error_response, status_code = check_session()
     if error_response: return error_response, status_code
     category = request.json.get('category')
-    current_month = datetime.now().strftime('%Y-%m')
-    with get_db() as conn:
+    current_month = current_month_year()
+    with write_transaction() as conn:
         conn.execute('DELETE FROM budgets WHERE user_id = ? AND category = ? AND month_year = ?',
                      (session.get('user_id'), category, current_month))
-        conn.commit()
-    return jsonify({"success": True})
+    return ojsonify({"success": True})
 
 @app.route('/api/expense', methods=['POST'])
 def add_expense():
     error_response, status_code = check_session()
     if error_response: return error_response, status_code
     category = request.json.get('category')
-    amount = request.json.get('amount')
+    amount_paise = to_paise(request.json.get('amount'))
+    if amount_paise is None:
+        return ojsonify({"error": "Invalid amount"}), 400
     description = request.json.get('description', '')
-    with get_db() as conn:
-        conn.execute('INSERT INTO expenses (user_id, category, amount, description) VALUES (?, ?, ?, ?)',
-                     (session.get('user_id'), category, amount, description))
-        conn.commit()
-    check_overspending(session.get('user_id'), category)
-    return jsonify({"success": True})
+    with write_transaction() as conn:
+        conn.execute('INSERT INTO expenses (user_id, category, amount_paise, description) VALUES (?, ?, ?, ?)',
+                     (session.get('user_id'), category, amount_paise, description))
+        alerts = check_overspending(conn, session.get('user_id'), [category])
+    publish_notifications(session.get('user_id'), alerts)
+    return ojsonify({"success": True})
+
+@app.route('/api/expenses/bulk', methods=['POST'])
+def add_expenses_bulk():
+    error_response, status_code = check_session()
+    if error_response: return error_response, status_code
+    entries = request.json
+    if not isinstance(entries, list) or not all(isinstance(e, dict) for e in entries):
+        return ojsonify({"error": "Expected a list of expenses"}), 400
+    user_id = session.get('user_id')
+    rows = []
+    # Validate every row up front so a bad one is a 400 naming it, not a 500 mid-transaction.
+    for i, entry in enumerate(entries):
+        category = entry.get('category')
+        if not isinstance(category, str) or not category:
+            return ojsonify({"error": f"Invalid category in expense {i}"}), 400
+        amount_paise = to_paise(entry.get('amount'))
+        if amount_paise is None:
+            return ojsonify({"error": f"Invalid amount in expense {i}"}), 400
+        description = entry.get('description', '')
+        if description is not None and not isinstance(description, str):
+            return ojsonify({"error": f"Invalid description in expense {i}"}), 400
+        rows.append((user_id, category, amount_paise, description))
+    # One transaction (and one WAL commit) for the whole import instead of one per row.
+    with write_transaction() as conn:
+        conn.executemany('INSERT INTO expenses (user_id, category, amount_paise, description) VALUES (?, ?, ?, ?)', rows)
+        alerts = check_overspending(conn, user_id, sorted({row[1] for row in rows}))
+    publish_notifications(user_id, alerts)
+    return ojsonify({"success": True, "inserted": len(rows)})
 
 @app.route('/api/goal', methods=['POST'])
 def add_goal():
     error_response, status_code = check_session()
     if error_response: return error_response, status_code
     name = request.json.get('name')
-    target_amount = request.json.get('target')
+    target_paise = to_paise(request.json.get('target'))
+    if target_paise is None:
+        return ojsonify({"error": "Invalid amount"}), 400
     deadline = request.json.get('deadline')
     try:
-        with get_db() as conn:
-            conn.execute('INSERT INTO goals (user_id, name, target_amount, deadline) VALUES (?, ?, ?, ?)',
-                         (session.get('user_id'), name, target_amount, deadline))
-            conn.commit()
-        return jsonify({"success": True})
+        with write_transaction() as conn:
+            conn.execute('INSERT INTO goals (user_id, name, target_paise, deadline) VALUES (?, ?, ?, ?)',
+                         (session.get('user_id'), name, target_paise, deadline))
+        return ojsonify({"success": True})
     except sqlite3.IntegrityError:
-        return jsonify({"error": f"A goal with the name '{name}' already exists."}), 400
+        return ojsonify({"error": f"A goal with the name '{name}' already exists."}), 400
 
 @app.route('/api/goal/delete', methods=['POST'])
 def delete_goal():
     error_response, status_code = check_session()
     if error_response: return error_response, status_code
     name = request.json.get('name')
-    with get_db() as conn:
+    with write_transaction() as conn:
         conn.execute('DELETE FROM goals WHERE user_id = ? AND name = ?',
                      (session.get('user_id'), name))
-        conn.commit()
-    return jsonify({"success": True})
+    return ojsonify({"success": True})
 
 @app.route('/api/saving', methods=['POST'])
 def add_saving():
     error_response, status_code = check_session()
     if error_response: return error_response, status_code
     goal_name = request.json.get('goal_name')
-    amount = request.json.get('amount')
-    with get_db() as conn:
-        conn.execute('UPDATE goals SET current_amount = current_amount + ? WHERE user_id = ? AND name = ?',
-                     (amount, session.get('user_id'), goal_name))
-        conn.commit()
-    return jsonify({"success": True})
+    amount_paise = to_paise(request.json.get('amount'))
+    if amount_paise is None:
+        return ojsonify({"error": "Invalid amount"}), 400
+    with write_transaction() as conn:
+        conn.execute('UPDATE goals SET current_paise = current_paise + ? WHERE user_id = ? AND name = ?',
+                     (amount_paise, session.get('user_id'), goal_name))
+    return ojsonify({"success": True})
 
 @app.route('/api/notifications')
 def get_notifications():
     error_response, status_code = check_session()
     if error_response: return error_response, status_code
-    with get_db() as conn:
-        notifications = conn.execute('SELECT message, type, is_read, created_at FROM notifications WHERE user_id = ? ORDER BY created_at DESC LIMIT 50', (session.get('user_id'),)).fetchall()
-    return jsonify([dict(n) for n in notifications])
+    rows = tuple_cursor(get_db()).execute(NOTIFICATIONS_SQL, (session.get('user_id'),)).fetchall()
+    return ojsonify(notification_dicts(rows))
+
+@app.route('/api/notifications/stream')
+def stream_notifications():
+    error_response, status_code = check_session()
+    if error_response: return error_response, status_code
+    if not NOTIFICATION_STREAM_ENABLED:
+        return Response(status=204)  # tells EventSource not to reconnect; the page falls back to polling
+    # Holds no DB connection: the generator only waits on its queue.
+    response = Response(notification_events(session.get('user_id')), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # stop nginx-style proxies from buffering events
+    return response
+
+@app.route('/api/notifications/ack', methods=['POST'])
+def ack_notifications():
+    error_response, status_code = check_session()
+    if error_response: return error_response, status_code
+    ids = request.json.get('ids')
+    # Row ids are SQLite 64-bit integers; anything outside that range can't match and can't be encoded.
+    if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) and -2**63 <= i < 2**63 for i in ids):
+        return ojsonify({"error": "Invalid notification ids"}), 400
+    if ids:
+        with write_transaction() as conn:
+            conn.execute(ACK_NOTIFICATIONS_SQL, (session.get('user_id'), orjson.dumps(ids).decode()))
+    return ojsonify({"success": True})
 
 @app.route('/api/analytics/trends')
 def get_trends():
     error_response, status_code = check_session()
     if error_response: return error_response, status_code
-    return jsonify(generate_trend_analysis(session.get('user_id')))
+    return ojsonify(generate_trend_analysis(session.get('user_id')))
+
+# Hot-path statements live at module scope so each string is built once, and their rows are
+# read as plain tuples: positional unpacking skips sqlite3.Row's per-access column lookup.
+USER_LOGIN_SQL = 'SELECT id, password_hash FROM users WHERE username = ?'
+REHASH_PASSWORD_SQL = 'UPDATE users SET password_hash = ? WHERE id = ?'
+NOTIFICATIONS_SQL = 'SELECT id, message, type, is_read, created_at FROM notifications WHERE user_id = ? ORDER BY created_at DESC LIMIT 50'
+RECENT_ALERTS_SQL = 'SELECT id, message, type, is_read, created_at FROM notifications WHERE user_id = ? ORDER BY id DESC LIMIT ?'
+# The ids arrive as one JSON array bound to a single parameter, so every batch size shares one
+# cached prepared statement and no batch can hit SQLite's host-parameter limit.
+ACK_NOTIFICATIONS_SQL = 'UPDATE notifications SET is_read = 1 WHERE user_id = ? AND id IN (SELECT value FROM json_each(?))'
+TRENDS_SQL = 'SELECT month_year, total_paise FROM expense_monthly WHERE user_id = ? AND month_year >= ? ORDER BY month_year'
+
+def tuple_cursor(conn):
+    cur = conn.cursor()
+    cur.row_factory = None
+    return cur
+
+def notification_dicts(rows):
+    # is_read is stored as 0/1; the API has always sent it as a JSON boolean.
+    return [{'id': n_id, 'message': message, 'type': kind, 'is_read': bool(is_read), 'created_at': created_at}
+            for n_id, message, kind, is_read, created_at in rows]
+
+RECENT_EXPENSES_LIMIT = 100  # the history isn't needed in full: totals come from category_totals
+
+# The order-free parts of /api/data (income, budgets, per-category totals), built by SQLite's
+# JSON functions and embedded into the response as-is. Scalar subqueries are wrapped in json()
+# so their values embed as JSON, not as quoted text, on every SQLite version.
+USER_SUMMARY_SQL = '''
+    SELECT
+        coalesce(
+            json((SELECT json_object('amount', amount_paise / 100.0, 'updated_at', created_at) FROM income WHERE user_id = :user_id AND month_year = :month)),
+            json_object('amount', 0, 'updated_at', NULL)),
+        json((SELECT json_group_object(category, json_object('amount', amount_paise / 100.0)) FROM budgets WHERE user_id = :user_id AND month_year = :month)),
+        json((SELECT json_group_object(category, total / 100.0) FROM (
+            SELECT category, SUM(amount_paise) AS total FROM expenses WHERE user_id = :user_id AND month_year = :month GROUP BY category)))
+'''
+# The ordered lists stay plain SELECTs: SQLite before 3.44 can't order inside an aggregate, and
+# a subquery's ORDER BY isn't guaranteed to survive json_group_array.
+RECENT_EXPENSES_SQL = 'SELECT category, amount_paise, description, timestamp FROM expenses WHERE user_id = ? ORDER BY timestamp DESC LIMIT ?'
+GOALS_SQL = 'SELECT name, target_paise, current_paise, deadline FROM goals WHERE user_id = ? ORDER BY created_at DESC'
+UNREAD_NOTIFICATIONS_SQL = 'SELECT id, message, type, is_read, created_at FROM notifications WHERE user_id = ? AND is_read = 0 ORDER BY created_at DESC LIMIT 10'
 
 def load_user_data(user_id):
-    with get_db() as conn:
-        current_month = datetime.now().strftime('%Y-%m')
-        income = conn.execute('SELECT amount, created_at FROM income WHERE user_id = ? AND month_year = ?', (user_id, current_month)).fetchone()
-        budgets = conn.execute('SELECT category, amount FROM budgets WHERE user_id = ? AND month_year = ?', (user_id, current_month)).fetchall()
-        expenses = conn.execute('SELECT category, amount, description, timestamp FROM expenses WHERE user_id = ? ORDER BY timestamp DESC', (user_id,)).fetchall()
-        goals = conn.execute('SELECT name, target_amount, current_amount, deadline FROM goals WHERE user_id = ? ORDER BY created_at DESC', (user_id,)).fetchall()
-        notifications = conn.execute('SELECT message, type, is_read, created_at FROM notifications WHERE user_id = ? AND is_read = 0 ORDER BY created_at DESC LIMIT 10', (user_id,)).fetchall()
-    return {
-        'income': { 'amount': float(income['amount']) if income else 0, 'updated_at': str(income['created_at']) if income else None },
-        'budgets': { b['category']: {'amount': float(b['amount'])} for b in budgets },
-        'expenses': [ {'category': e['category'], 'amount': float(e['amount']), 'description': e['description'] or '', 'timestamp': str(e['timestamp'])} for e in expenses ],
-        'goals': { g['name']: { 'target': float(g['target_amount']), 'current': float(g['current_amount']), 'deadline': str(g['deadline']) } for g in goals },
-        'notifications': [ {'message': n['message'], 'type': n['type'], 'is_read': bool(n['is_read']), 'created_at': str(n['created_at'])} for n in notifications ]
-    }
-
-def check_overspending(user_id, category):
-    with get_db() as conn:
-        current_month = datetime.now().strftime('%Y-%m')
-        budget = conn.execute('SELECT amount FROM budgets WHERE user_id = ? AND category = ? AND month_year = ?', (user_id, category, current_month)).fetchone()
-        if not budget: return
-        month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        total_spent_row = conn.execute('SELECT SUM(amount) as total FROM expenses WHERE user_id = ? AND category = ? AND timestamp >= ?', (user_id, category, month_start)).fetchone()
-        total_spent = total_spent_row['total'] or 0
-        budget_amount = float(budget['amount'])
-        if total_spent > budget_amount:
-            overspent_amount = total_spent - budget_amount
-            message = f"Overspending alert! You've exceeded your '{category}' budget by ₹{overspent_amount:.2f}"
-            conn.execute('INSERT INTO notifications (user_id, message, type) VALUES (?, ?, ?)', (user_id, message, 'danger'))
-            conn.commit()
+    # Returns the serialized JSON document, ready to send as-is.
+    cur = tuple_cursor(get_db())
+    cur.execute('BEGIN')  # one snapshot across the four reads
+    try:
+        income, budgets, category_totals = cur.execute(USER_SUMMARY_SQL, {'user_id': user_id, 'month': current_month_year()}).fetchone()
+        expenses = cur.execute(RECENT_EXPENSES_SQL, (user_id, RECENT_EXPENSES_LIMIT)).fetchall()
+        goals = cur.execute(GOALS_SQL, (user_id,)).fetchall()
+        notifications = cur.execute(UNREAD_NOTIFICATIONS_SQL, (user_id,)).fetchall()
+    finally:
+        cur.execute('COMMIT')
+    return orjson.dumps({
+        'income': orjson.Fragment(income),
+        'budgets': orjson.Fragment(budgets),
+        'category_totals': orjson.Fragment(category_totals),
+        'expenses': [{'category': category, 'amount': paise / 100, 'description': description or '', 'timestamp': timestamp}
+                     for category, paise, description, timestamp in expenses],
+        'goals': {name: {'target': target / 100, 'current': current / 100, 'deadline': deadline}
+                  for name, target, current, deadline in goals},
+        'notifications': notification_dicts(notifications),
+    })
+
+# Raises an alert for one category when this month's spend exceeds its budget; a no-op otherwise.
+OVERSPENDING_ALERT_SQL = '''
+    WITH spent AS (
+        SELECT SUM(amount_paise) AS total FROM expenses WHERE user_id = :user_id AND month_year = :month AND category = :category
+    )
+    INSERT INTO notifications (user_id, message, type)
+    SELECT :user_id,
+           printf('Overspending alert! You''ve exceeded your ''%s'' budget by ₹%d.%02d', :category,
+                  (spent.total - b.amount_paise) / 100, (spent.total - b.amount_paise) % 100),
+           'danger'
+    FROM budgets b, spent
+    WHERE b.user_id = :user_id AND b.category = :category AND b.month_year = :month AND spent.total > b.amount_paise
+'''
+
+def check_overspending(conn, user_id, categories):
+    # Runs inside the caller's transaction so the expense and its alert commit together.
+    # Returns the alerts it raised, oldest first, for the caller to publish once committed.
+    current_month = current_month_year()
+    # total_changes rather than rowcount: sqlite3 reports -1 for statements starting with WITH.
+    changes_before = conn.total_changes
+    conn.executemany(OVERSPENDING_ALERT_SQL, [{'user_id': user_id, 'month': current_month, 'category': c} for c in categories])
+    raised = conn.total_changes - changes_before
+    if raised <= 0:
+        return []
+    rows = tuple_cursor(conn).execute(RECENT_ALERTS_SQL, (user_id, raised)).fetchall()
+    return notification_dicts(reversed(rows))
+
+# In-process pub/sub for /api/notifications/stream: user_id -> one queue per open stream.
+# Streams only hear alerts raised by this process, and each open stream holds a server thread,
+# so streaming needs a long-lived, threaded (or async) server: `python app.py` or gunicorn with
+# gthread/gevent workers. Serverless deployments (Vercel) and sync workers should set
+# NOTIFICATION_STREAM=0; the endpoint then answers 204 and the page polls /api/notifications.
+# Streams also end after NOTIFICATION_STREAM_SECONDS: the browser reconnects and resyncs from
+# /api/notifications, which bounds how long alerts raised by another process go unseen.
+NOTIFICATION_STREAM_ENABLED = os.environ.get('NOTIFICATION_STREAM', '0' if os.environ.get('VERCEL') else '1') == '1'
+NOTIFICATION_HEARTBEAT_SECONDS = 15
+NOTIFICATION_STREAM_SECONDS = 120
+_notification_streams = {}
+_notification_streams_lock = threading.Lock()
+
+def publish_notifications(user_id, notifications):
+    if not notifications:
+        return
+    with _notification_streams_lock:
+        streams = list(_notification_streams.get(user_id, ()))
+    for q in streams:
+        for n in notifications:
+            q.put(n)
+
+def notification_events(user_id):
+    q = queue.SimpleQueue()
+    with _notification_streams_lock:
+        _notification_streams.setdefault(user_id, set()).add(q)
+    deadline = time.monotonic() + NOTIFICATION_STREAM_SECONDS
+    try:
+        yield b'retry: 2000\n\n'  # flushes the headers now and sets the browser's reconnect delay
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                yield b'data: ' + orjson.dumps(q.get(timeout=min(NOTIFICATION_HEARTBEAT_SECONDS, remaining))) + b'\n\n'
+            except queue.Empty:
+                yield b': keepalive\n\n'  # comment line: keeps proxies from closing an idle stream
+    finally:
+        with _notification_streams_lock:
+            _notification_streams[user_id].discard(q)
+            if not _notification_streams[user_id]:
+                del _notification_streams[user_id]
 
 def generate_trend_analysis(user_id):
-    with get_db() as conn:
-        six_months_ago = (datetime.now() - timedelta(days=180)).strftime('%Y-%m-01')
-        trends = conn.execute('''
-            SELECT strftime('%Y-%m', timestamp) as month, SUM(amount) as total_expenses
-            FROM expenses WHERE user_id = ? AND timestamp >= ?
-            GROUP BY month ORDER BY month ''', (user_id, six_months_ago)).fetchall()
-    return {'labels': [t['month'] for t in trends], 'expenses': [float(t['total_expenses']) for t in trends]}
+    six_months_ago = month_year(datetime.now() - timedelta(days=180))
+    rows = tuple_cursor(get_db()).execute(TRENDS_SQL, (user_id, six_months_ago)).fetchall()
+    return {'labels': [month for month, _ in rows], 'expenses': [total_paise / 100 for _, total_paise in rows]}
 
 if __name__ == '__main__':
     app.run(debug=True, port=5001)
\ No newline at end of file
@@ -0,0 +1,341 @@
+let state = { income: {}, budgets: {}, category_totals: {}, expenses: [], goals: {}, notifications: [] };
+let expenseChart, trendChart;
+
+// UPDATE: Fixed timestamp to always use Indian Standard Time
+function formatTimestamp(isoString) {
+    if (!isoString) return '';
+    const options = {
+        year: 'numeric', month: 'short', day: 'numeric',
+        hour: 'numeric', minute: '2-digit', hour12: true,
+        timeZone: 'Asia/Kolkata'
+    };
+    return new Date(isoString).toLocaleString('en-IN', options);
+}
+
+// --- API Helpers ---
+async function apiCall(url, method = 'GET', data = null) {
+    const options = { method, headers: { 'Content-Type': 'application/json' } };
+    if (data) options.body = JSON.stringify(data);
+    const res = await fetch(url, options);
+    if (!res.ok) {
+        const error = await res.json();
+        throw new Error(error.error || 'An unknown error occurred');
+    }
+    return res.json();
+}
+
+// --- State Management ---
+async function loadState() {
+  try {
+    state = await apiCall("/api/data");
+    refreshUI();
+  } catch (err) {
+    showToast(err.message, 'error');
+    if (err.message.includes("Not authorized")) window.location.href = "/login";
+  }
+}
+
+// --- Actions ---
+async function setIncome(amount) {
+  try { await apiCall("/api/income", "POST", { amount }); await loadState(); showToast('Income updated!', 'success');
+  } catch (e) { showToast(e.message, 'error'); }
+}
+async function addBudget(category, amount) {
+  try { await apiCall("/api/budget", "POST", { category, amount }); await loadState(); showToast('Budget updated!', 'success');
+  } catch (e) { showToast(e.message, 'error'); }
+}
+async function addExpense(category, amount, description = "") {
+  try { await apiCall("/api/expense", "POST", { category, amount, description }); await loadState(); showToast('Expense recorded!', 'success');
+  } catch (e) { showToast(e.message, 'error'); }
+}
+async function addGoal(name, target, deadline) {
+  try { await apiCall("/api/goal", "POST", { name, target, deadline }); await loadState(); showToast('New goal set!', 'success');
+  } catch (e) { showToast(e.message, 'error'); }
+}
+async function addSaving(goal_name, amount) {
+  if (!goal_name) { showToast('Please select a goal first.', 'error'); return; }
+  try { await apiCall("/api/saving", "POST", { goal_name, amount }); await loadState(); showToast(`₹${amount.toFixed(2)} added to "${goal_name}"`, 'success');
+  } catch (e) { showToast(e.message, 'error'); }
+}
+// NEW: Delete actions
+async function deleteBudget(category) {
+  if (!confirm(`Are you sure you want to delete the "${category}" budget?`)) return;
+  try { await apiCall("/api/budget/delete", "POST", { category }); await loadState(); showToast('Budget deleted.', 'success');
+  } catch (e) { showToast(e.message, 'error'); }
+}
+async function deleteGoal(name) {
+  if (!confirm(`Are you sure you want to delete the "${name}" goal?`)) return;
+  try { await apiCall("/api/goal/delete", "POST", { name }); await loadState(); showToast('Goal deleted.', 'success');
+  } catch (e) { showToast(e.message, 'error'); }
+}
+// NEW: Quick Save action
+function addRemainingBalanceToGoal() {
+    const goalName = document.getElementById('quick-save-goal-selector').value;
+    if (!goalName) { showToast('Please select a goal from the dropdown.', 'error'); return; }
+
+    const totalExpenses = monthlySpent();
+    const income = state.income.amount || 0;
+    const remaining = income - totalExpenses;
+
+    if (remaining <= 0) {
+        showToast('No remaining balance to save.', 'warning');
+        return;
+    }
+    addSaving(goalName, remaining);
+}
+
+// --- UI Rendering ---
+function refreshUI() {
+    updateDashboardStats();
+    refreshExpenseList(state.expenses);
+    refreshBudgetList();
+    refreshGoalList();
+    refreshSelectors();
+    updateCharts();
+    displayBudgetAlerts();
+    updateNotificationCount();
+}
+
+// Current-month spend per category is aggregated server-side in /api/data
+function monthlySpent() {
+  return Object.values(state.category_totals || {}).reduce((sum, v) => sum + v, 0);
+}
+
+function updateDashboardStats() {
+  const totalExpenses = monthlySpent();
+  const income = state.income.amount || 0;
+  const remaining = income - totalExpenses;
+  const savingsRate = income > 0 ? ((remaining / income) * 100).toFixed(1) : 0;
+  document.getElementById('dashboard-income').textContent = `₹${income.toFixed(2)}`;
+  document.getElementById('dashboard-expenses').textContent = `₹${totalExpenses.toFixed(2)}`;
+  document.getElementById('dashboard-remaining').textContent = `₹${remaining.toFixed(2)}`;
+  document.getElementById('dashboard-savings-rate').textContent = `${savingsRate > 0 ? savingsRate : 0}%`;
+  const incomeUpdatedElem = document.getElementById('income-last-updated');
+  if (state.income && state.income.updated_at) {
+      incomeUpdatedElem.textContent = `Last updated: ${formatTimestamp(state.income.updated_at)}`;
+  } else {
+      incomeUpdatedElem.textContent = 'No income set for this month yet.';
+  }
+}
+
+function refreshExpenseList(allExpenses) {
+  const list = document.getElementById('expenseList');
+  if (!allExpenses || allExpenses.length === 0) { list.innerHTML = "<p>No expenses recorded yet.</p>"; return; }
+  list.innerHTML = allExpenses.slice(0, 10).map(e => `
+    <div class="list-item">
+        <div>
+            <strong style="display:block;">${e.category}</strong>
+            <span style="font-size:0.9em; color:var(--muted-text);">${e.description || formatTimestamp(e.timestamp)}</span>
+        </div>
+        <span style="font-weight:600; font-size:1.1em;">₹${e.amount.toFixed(2)}</span>
+    </div>`).join('');
+}
+
+// NEW: Function to render the budget list with delete buttons
+function refreshBudgetList() {
+    const container = document.getElementById('budgetList');
+    const budgets = state.budgets || {};
+    const keys = Object.keys(budgets);
+    if (keys.length === 0) { container.innerHTML = "<p>No budgets set for this month.</p>"; return; }
+    container.innerHTML = keys.map(k => {
+        const b = budgets[k];
+        return `<div class="list-item">
+                    <span><strong>${k}</strong>: ₹${b.amount.toFixed(2)}</span>
+                    <button class="btn-delete" onclick="deleteBudget('${k}')">Delete</button>
+                </div>`;
+    }).join('');
+}
+
+function refreshGoalList() {
+    const container = document.getElementById('goalList');
+    const goals = state.goals || {};
+    const keys = Object.keys(goals);
+    if (keys.length === 0) { container.innerHTML = "<p>No goals set yet.</p>"; return; }
+    container.innerHTML = keys.map(k => {
+        const g = goals[k];
+        const pct = g.target > 0 ? Math.min(100, (g.current / g.target) * 100) : 0;
+        return `<div style="margin-bottom:16px; padding-bottom:12px; border-bottom: 1px solid var(--border-color);">
+                    <div style="display:flex; justify-content:space-between; align-items:center;">
+                        <strong>${k}</strong>
+                        <button class="btn-delete" onclick="deleteGoal('${k}')">Delete</button>
+                    </div>
+                    <div style="color:var(--muted-text); font-size:0.9em;">Deadline: ${g.deadline || 'N/A'}</div>
+                    <div style="display:flex; justify-content:space-between; color:var(--muted-text); font-size:0.9em;">
+                        <span>₹${g.current.toFixed(2)}</span>
+                        <span>₹${g.target.toFixed(2)}</span>
+                    </div>
+                    <div class="progress-bar"><div class="progress-fill" style="width:${pct}%;"></div></div>
+                </div>`;
+    }).join('');
+}
+
+function refreshSelectors() {
+    const budgetDatalist = document.getElementById('budget-categories');
+    const budgetCategories = Object.keys(state.budgets || {});
+    budgetDatalist.innerHTML = budgetCategories.map(cat => `<option value="${cat}">`).join('');
+
+    const goalSelector = document.getElementById('goal-selector');
+    const quickSaveSelector = document.getElementById('quick-save-goal-selector');
+    const goalNames = Object.keys(state.goals || {});
+    const goalOptions = '<option value="">Select a Goal</option>' + goalNames.map(name => `<option value="${name}">${name}</option>`).join('');
+    goalSelector.innerHTML = goalOptions;
+    quickSaveSelector.innerHTML = goalOptions;
+}
+
+function displayBudgetAlerts() {
+    const container = document.getElementById('budgetAlerts');
+    let html = '<h3>Budget Status</h3>';
+    const budgetKeys = Object.keys(state.budgets);
+    if(budgetKeys.length === 0) { container.innerHTML = '<h3>Budget Status</h3><p>No budgets set for this month.</p>'; return; }
+    budgetKeys.forEach(category => {
+        const budgetAmount = state.budgets[category].amount;
+        const spent = state.category_totals[category] || 0;
+        const pct = budgetAmount > 0 ? Math.min(100, (spent / budgetAmount) * 100) : 0;
+        const statusColor = pct >= 100 ? 'var(--danger-color)' : pct > 80 ? 'var(--warning-color)' : 'var(--success-color)';
+        html += `<div style="margin-bottom:12px;">
+                    <strong>${category}</strong>
+                    <div style="display:flex; justify-content:space-between; color:var(--muted-text); font-size:0.9em;">
+                       <span>Spent: ₹${spent.toFixed(2)}</span>
+                       <span>Budget: ₹${budgetAmount.toFixed(2)}</span>
+                    </div>
+                    <div class="progress-bar"><div class="progress-fill" style="width:${pct}%; background-color:${statusColor};"></div></div>
+                 </div>`;
+    });
+    container.innerHTML = html;
+}
+
+function toggleNotifications() {
+    const panel = document.getElementById('notificationPanel');
+    const isVisible = panel.style.display === 'block';
+    panel.style.display = isVisible ? 'none' : 'block';
+    if (!isVisible) loadNotifications().then(ackNotifications).catch(e => showToast(e.message, 'error'));
+}
+async function loadNotifications() {
+    state.notifications = await apiCall("/api/notifications");
+    updateNotificationCount();
+    renderNotificationPanel();
+}
+// New alerts are pushed over SSE. The server ends each stream after a while and the browser
+// reconnects on its own; alerts raised while disconnected are picked up by reloading the list on
+// every reconnect. Where streaming is unavailable (no EventSource, or the server answers 204 on a
+// deployment that can't hold streams open) the list is polled instead.
+const NOTIFICATION_POLL_MS = 60000;
+let notificationPoll = null;
+function pollNotifications() {
+    if (notificationPoll) return;
+    notificationPoll = setInterval(() => loadNotifications().catch(() => {}), NOTIFICATION_POLL_MS);
+}
+function subscribeNotifications() {
+    if (!window.EventSource) return pollNotifications();
+    const source = new EventSource("/api/notifications/stream");
+    source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) pollNotifications();
+    };
+    let opened = false;
+    source.onopen = () => {
+        if (opened) loadNotifications().catch(() => {});
+        opened = true;
+    };
+    source.onmessage = (e) => {
+        const n = JSON.parse(e.data);
+        if (state.notifications.some(x => x.id === n.id)) return;
+        state.notifications = [n, ...state.notifications].slice(0, 50);
+        updateNotificationCount();
+        renderNotificationPanel();
+    };
+}
+// Opening the panel marks everything shown as read in a single request.
+async function ackNotifications() {
+    const unreadIds = state.notifications.filter(n => !n.is_read).map(n => n.id);
+    if (!unreadIds.length) return;
+    await apiCall("/api/notifications/ack", "POST", { ids: unreadIds });
+    state.notifications.forEach(n => { n.is_read = true; });
+    updateNotificationCount();
+}
+function updateNotificationCount() {
+    const count = state.notifications.filter(n => !n.is_read).length;
+    document.getElementById('notificationCount').textContent = count;
+    document.getElementById('notificationCount').style.display = count > 0 ? 'flex' : 'none';
+}
+// Built from DOM nodes + textContent: no HTML parsing per render, and messages can't inject markup.
+function renderNotificationPanel() {
+    const panel = document.getElementById('notificationPanel');
+    const frag = document.createDocumentFragment();
+    if (!state.notifications.length) {
+        const empty = document.createElement('div');
+        empty.style.padding = '12px';
+        empty.textContent = 'No new notifications';
+        frag.appendChild(empty);
+    }
+    state.notifications.forEach(n => {
+        const item = document.createElement('div');
+        item.className = n.is_read ? 'notification-item' : 'notification-item unread';
+        const message = document.createElement('div');
+        message.style.fontSize = '14px';
+        message.textContent = n.message;
+        const time = document.createElement('div');
+        time.style.cssText = 'font-size:11px; color:var(--muted-text); margin-top:6px;';
+        time.textContent = formatTimestamp(n.created_at);
+        item.append(message, time);
+        frag.appendChild(item);
+    });
+    panel.replaceChildren(frag);
+}
+function showToast(message, type = 'success') {
+    const container = document.getElementById('toast-container');
+    const toast = document.createElement('div');
+    toast.className = `toast toast-${type}`;
+    toast.textContent = message;
+    container.appendChild(toast);
+    setTimeout(() => { toast.classList.add('show'); }, 10);
+    setTimeout(() => { toast.classList.remove('show'); setTimeout(() => toast.remove(), 300); }, 3000);
+}
+function debounce(fn, wait) {
+    let timer;
+    return (...args) => { clearTimeout(timer); timer = setTimeout(() => fn(...args), wait); };
+}
+// Charts are created once; later refreshes swap their data in place and redraw without animation.
+async function renderCharts() {
+    const pieCtx = document.getElementById("expenseChart")?.getContext("2d");
+    if (pieCtx) {
+        const categoryTotals = state.category_totals || {};
+        if (expenseChart) {
+            expenseChart.data.labels = Object.keys(categoryTotals);
+            expenseChart.data.datasets[0].data = Object.values(categoryTotals);
+            expenseChart.update('none');
+        } else {
+            expenseChart = new Chart(pieCtx, { type: "pie", data: { labels: Object.keys(categoryTotals), datasets: [{ data: Object.values(categoryTotals) }] } });
+        }
+    }
+    const trendCtx = document.getElementById("trendChart")?.getContext("2d");
+    if (trendCtx) {
+        const trends = await apiCall("/api/analytics/trends");
+        if (trendChart) {
+            trendChart.data.labels = trends.labels;
+            trendChart.data.datasets[0].data = trends.expenses;
+            trendChart.update('none');
+        } else {
+            trendChart = new Chart(trendCtx, {
+                type: 'line',
+                data: { labels: trends.labels, datasets: [{ label: 'Expenses', data: trends.expenses, tension: 0.2, borderColor: 'var(--primary-color)', pointBackgroundColor: 'var(--primary-color)' }] },
+                options: { responsive:true, scales:{ y:{ beginAtZero:true } } }
+            });
+        }
+    }
+}
+const updateCharts = debounce(renderCharts, 100);
+function toggleTheme() {
+    const currentTheme = document.body.getAttribute('data-theme');
+    const newTheme = currentTheme === 'light' ? 'dark' : 'light';
+    document.body.setAttribute('data-theme', newTheme);
+    localStorage.setItem('theme', newTheme);
+}
+window.onload = async function () {
+    const savedTheme = localStorage.getItem('theme') || 'light';
+    document.body.setAttribute('data-theme', savedTheme);
+    await loadState();
+    await loadNotifications();
+    subscribeNotifications();
+};
+function logout() { window.location.href = "/logout"; }
+